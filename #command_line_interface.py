@@ -1,252 +0,0 @@
-import inspect
-import logging
-import shlex
-import mido
-import asyncio
-
-from aioconsole import ainput
-
-from joycontrol.controller_state import button_push, ControllerState
-from joycontrol.transport import NotConnectedError
-
-logger = logging.getLogger(__name__)
-
-midi_to_key = {38: "a",
-               48: "x",
-               46: "r",
-               42: "r",
-               36: "l",
-               51: "stick l h 3000",
-               55: "stick l h 1048",
-               45: "up",
-               41: "down",
-               6: "hold b&&stick l center",
-               5: "release b&&stick l center",
-               7: "stick l center"}
-
-arlBuffer = {38: 0, 46: 0, 36: 0}
-
-def _print_doc(string):
-    """
-    Attempts to remove common white space at the start of the lines in a doc string
-    to unify the output of doc strings with different indention levels.
-
-    Keeps whitespace lines intact.
-
-    :param fun: function to print the doc string of
-    """
-    lines = string.split('\n')
-    if lines:
-        prefix_i = 0
-        for i, line_0 in enumerate(lines):
-            # find non empty start lines
-            if line_0.strip():
-                # traverse line and stop if character mismatch with other non empty lines
-                for prefix_i, c in enumerate(line_0):
-                    if not c.isspace():
-                        break
-                    if any(lines[j].strip() and (prefix_i >= len(lines[j]) or c != lines[j][prefix_i])
-                           for j in range(i+1, len(lines))):
-                        break
-                break
-
-        for line in lines:
-            print(line[prefix_i:] if line.strip() else line)
-
-
-class CLI:
-    def __init__(self):
-        self.commands = {}
-
-    def add_command(self, name, command):
-        if name in self.commands:
-            raise ValueError(f'Command {name} already registered.')
-        self.commands[name] = command
-
-    async def cmd_help(self):
-        print('Commands:')
-        for name, fun in inspect.getmembers(self):
-            if name.startswith('cmd_') and fun.__doc__:
-                _print_doc(fun.__doc__)
-
-        for name, fun in self.commands.items():
-            if fun.__doc__:
-                _print_doc(fun.__doc__)
-
-        print('Commands can be chained using "&&"')
-        print('Type "exit" to close.')
-
-    async def run(self):
-        count = pg.get_count()
-        for i in range(count):
-            print(pg.get_device_info(i))
-        inp = pg.Input(3)
-
-        while True:
-            user_input = await ainput(prompt='cmd >> ')
-            if not user_input:
-                continue
-
-            for command in user_input.split('&&'):
-                cmd, *args = shlex.split(command)
-
-                if cmd == 'exit':
-                    return
-
-                if hasattr(self, f'cmd_{cmd}'):
-                    try:
-                        result = await getattr(self, f'cmd_{cmd}')(*args)
-                        if result:
-                            print(result)
-                    except Exception as e:
-                        print(e)
-                elif cmd in self.commands:
-                    try:
-                        result = await self.commands[cmd](*args)
-                        if result:
-                            print(result)
-                    except Exception as e:
-                        print(e)
-                else:
-                    print('command', cmd, 'not found, call help for help.')
-
-    @staticmethod
-    def deprecated(message):
-        async def dep_printer(*args, **kwargs):
-            print(message)
-
-        return dep_printer
-
-
-class ControllerCLI(CLI):
-    def __init__(self, controller_state: ControllerState):
-        super().__init__()
-        self.controller_state = controller_state
-
-    async def cmd_help(self):
-        print('Button commands:')
-        print(', '.join(self.controller_state.button_state.get_available_buttons()))
-        print()
-        await super().cmd_help()
-
-    @staticmethod
-    def _set_stick(stick, direction, value):
-        if direction == 'center':
-            stick.set_center()
-        elif direction == 'up':
-            stick.set_up()
-        elif direction == 'down':
-            stick.set_down()
-        elif direction == 'left':
-            stick.set_left()
-        elif direction == 'right':
-            stick.set_right()
-        elif direction in ('h', 'horizontal'):
-            if value is None:
-                raise ValueError(f'Missing value')
-            try:
-                val = int(value)
-            except ValueError:
-                raise ValueError(f'Unexpected stick value "{value}"')
-            stick.set_h(val)
-        elif direction in ('v', 'vertical'):
-            if value is None:
-                raise ValueError(f'Missing value')
-            try:
-                val = int(value)
-            except ValueError:
-                raise ValueError(f'Unexpected stick value "{value}"')
-            stick.set_v(val)
-        else:
-            raise ValueError(f'Unexpected argument "{direction}"')
-
-        return f'{stick.__class__.__name__} was set to ({stick.get_h()}, {stick.get_v()}).'
-
-    async def cmd_stick(self, side, direction, value=None):
-        """
-        stick - Command to set stick positions.
-        :param side: 'l', 'left' for left control stick; 'r', 'right' for right control stick
-        :param direction: 'center', 'up', 'down', 'left', 'right';
-                          'h', 'horizontal' or 'v', 'vertical' to set the value directly to the "value" argument
-        :param value: horizontal or vertical value
-        """
-        if side in ('l', 'left'):
-            stick = self.controller_state.l_stick_state
-            return ControllerCLI._set_stick(stick, direction, value)
-        elif side in ('r', 'right'):
-            stick = self.controller_state.r_stick_state
-            return ControllerCLI._set_stick(stick, direction, value)
-        else:
-            raise ValueError('Value of side must be "l", "left" or "r", "right"')
-
-    async def run(self):
-        timerspeed = 0
-        timer = 0
-        
-        inputs = mido.get_input_names()
-        portname = ""
-        for i in inputs:
-            if "drum" in i.lower():
-                portname = i
-                break
-
-        inport = mido.open_input(portname)
-
-        for msg in inport:
-            timer += timerspeed
-            user_input = ""
-
-                justhit = False
-                for u in full:
-                    #print(u)
-                    if not u[0][1] in midi_input:
-                        if u[0][1] == 4:
-                            midi_input.append(6 if u[0][2]>60 else 5)
-                        elif u[0][0] == 137:
-                            midi_input.append(u[0][1])
-                            arlBuffer[u[0][1]] = 0.06
-                            justhit = True
-                if justhit and False:
-                    for k in arlBuffer.keys():
-                        if arlBuffer[k]>0 and not k in midi_input:
-                            midi_input.append(k)
-                print(midi_input)
-
-            if not us
-            buttons_to_push = []
-
-            for command in user_input.split('&&'):
-                cmd, *args = shlex.split(command)
-
-                if cmd == 'exit':
-                    return
-
-                available_buttons = self.controller_state.button_state.get_available_buttons()
-
-                if hasattr(self, f'cmd_{cmd}'):
-                    try:
-                        result = await getattr(self, f'cmd_{cmd}')(*args)
-                        if result:
-                            print(result)
-                    except Exception as e:
-                        print(e)
-                elif cmd in self.commands:
-                    try:
-                        result = await self.commands[cmd](*args)
-                        if result:
-                            print(result)
-                    except Exception as e:
-                        print(e)
-                elif cmd in available_buttons:
-                    buttons_to_push.append(cmd)
-                else:
-                    print('command', cmd, 'not found, call help for help.')
-
-            if buttons_to_push:
-                await button_push(self.controller_state, *buttons_to_push)
-            else:
-                try:
-                    await self.controller_state.send()
-                except NotConnectedError:
-                    logger.info('Connection was lost.')
-                    return
@@ -1,7 +1,9 @@
+import heapq
 import inspect
 import logging
 import shlex
-import mido
+import textwrap
+import rtmidi
 import asyncio
 import time
 
@@ -12,6 +14,17 @@ from joycontrol.transport import NotConnectedError
 
 logger = logging.getLogger(__name__)
 
+# midi status bytes without the channel nibble
+_NOTE_ON = 0x90
+_CONTROL_CHANGE = 0xB0
+
+# uvloop lowers the per iteration overhead of the event loop, fall back to the default loop where it is unavailable
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
+
 midi_to_key = {38: "hold a&&hold y",
                48: "hold x",
                42: "hold l&&hold zl",
@@ -24,39 +37,57 @@ midi_to_key = {38: "hold a&&hold y",
                5: "release b&&stick l center",
                7: "stick l center"}
 
-arlBuffer = {}
+
+def _make_release(user_input):
+    """
+    Tokenizes the commands undoing the input of a midi key: held buttons are released and sticks are centered.
+    """
+    cmds = []
+    for command in user_input.split("&&"):
+        cmd, *args = command.split()
+        if cmd == "hold":
+            cmd = "release"
+        elif cmd == "stick":
+            args = [args[0], "center"]
+        cmds.append([cmd, *args])
+    return cmds
+
+
+# midi_to_key is static, so tokenize the commands once instead of on every midi message.
+# The entries contain no quoting, plain whitespace splitting is enough.
+midi_to_cmds = {k: [seg.split() for seg in v.split("&&")] for k, v in midi_to_key.items()}
+midi_to_release_cmds = {k: _make_release(v) for k, v in midi_to_key.items()}
+
+# lookup tables indexed directly by the 7 bit midi note, unmapped notes have no commands
+midi_cmd_lut = [()] * 128
+midi_release_lut = [()] * 128
+# seconds until a hit note is released, sticks are held longer than buttons
+midi_hold_lut = [0.04] * 128
+for _note, _cmds in midi_to_cmds.items():
+    midi_cmd_lut[_note] = _cmds
+    midi_release_lut[_note] = midi_to_release_cmds[_note]
+    if any(c[0] == "stick" for c in _cmds):
+        midi_hold_lut[_note] = 0.3
+
 
 def _print_doc(string):
     """
     Attempts to remove common white space at the start of the lines in a doc string
     to unify the output of doc strings with different indention levels.
 
-    Keeps whitespace lines intact.
+    Whitespace only lines are printed as empty lines.
 
-    :param fun: function to print the doc string of
+    :param string: doc string to print
     """
-    lines = string.split('\n')
-    if lines:
-        prefix_i = 0
-        for i, line_0 in enumerate(lines):
-            # find non empty start lines
-            if line_0.strip():
-                # traverse line and stop if character mismatch with other non empty lines
-                for prefix_i, c in enumerate(line_0):
-                    if not c.isspace():
-                        break
-                    if any(lines[j].strip() and (prefix_i >= len(lines[j]) or c != lines[j][prefix_i])
-                           for j in range(i+1, len(lines))):
-                        break
-                break
-
-        for line in lines:
-            print(line[prefix_i:] if line.strip() else line)
+    print(textwrap.dedent(string))
 
 
 class CLI:
     def __init__(self):
         self.commands = {}
+        # bound cmd_* methods by command name
+        self._cmd_dispatch = {name[4:]: fun for name, fun in inspect.getmembers(self, callable)
+                              if name.startswith('cmd_')}
 
     def add_command(self, name, command):
         if name in self.commands:
@@ -77,11 +108,6 @@ class CLI:
         print('Type "exit" to close.')
 
     async def run(self):
-        count = pg.get_count()
-        for i in range(count):
-            print(pg.get_device_info(i))
-        inp = pg.Input(3)
-
         while True:
             user_input = await ainput(prompt='cmd >> ')
             if not user_input:
@@ -93,16 +119,10 @@ class CLI:
                 if cmd == 'exit':
                     return
 
-                if hasattr(self, f'cmd_{cmd}'):
-                    try:
-                        result = await getattr(self, f'cmd_{cmd}')(*args)
-                        if result:
-                            print(result)
-                    except Exception as e:
-                        print(e)
-                elif cmd in self.commands:
+                fun = self._cmd_dispatch.get(cmd) or self.commands.get(cmd)
+                if fun is not None:
                     try:
-                        result = await self.commands[cmd](*args)
+                        result = await fun(*args)
                         if result:
                             print(result)
                     except Exception as e:
@@ -180,96 +200,153 @@ class ControllerCLI(CLI):
             raise ValueError('Value of side must be "l", "left" or "r", "right"')
 
     async def run(self):
-        inputs = mido.get_input_names()
-        portname = ""
-        for i in inputs:
-            if "drum" in i.lower():
-                portname = i
+        midi_in = rtmidi.MidiIn()
+        for port_index, portname in enumerate(midi_in.get_ports()):
+            if "drum" in portname.lower():
                 break
+        else:
+            raise ValueError('No midi drum input found.')
 
-        inport = mido.open_input(portname)
-        timer = time.perf_counter()
+        # rtmidi delivers messages from its own input thread, hand them over to the event loop
+        loop = asyncio.get_running_loop()
+        self._midi_q = asyncio.Queue()
+        # only touched from the rtmidi thread
         jumpstate = False
-        menumode = True
-        menuCounter = 0
-
-        while True:
-            dtime = time.perf_counter()-timer
-            timer = time.perf_counter()
-            msg = inport.poll()
-            for k in arlBuffer.keys():
-                arlBuffer[k] -= dtime
-            user_input = ""
-            if msg:
-                if msg.type=="note_on":
-                    msg.note = 42 if msg.note == 46 or (msg.note==38 and 38 in arlBuffer.keys()) else msg.note
-                    user_input = midi_to_key.get(msg.note, "")
-                    arlBuffer[msg.note] = 0.04 if not "stick" in user_input else 0.3
-                    if msg.note==48:
-                        menuCounter += 1
-                        if menuCounter>10:
-                            menumode = not menumode
-                            menuCounter = 0
-                            print("menumode "+str(menumode))
-                    else:
-                        menuCounter = 0
-                elif msg.type=="control_change":
-                    if msg.value > 64 and not jumpstate:
-                        user_input = midi_to_key.get(6, "")
-                        jumpstate = True
-                    elif msg.value <= 64 and jumpstate:
-                        user_input = midi_to_key.get(5, "")
-                        jumpstate = False
-            else:
-                for k in arlBuffer.keys():
-                    if arlBuffer[k]<=0:
-                        user_input = midi_to_key.get(k, "").replace("hold", "release")
-                        for s in midi_to_key.get(k, "").split("&&"):
-                            if "stick" in s:
-                                user_input = user_input.replace(s.split(" ", 2)[-1], "center")
-                        del arlBuffer[k]
-                        break
-            if not user_input:
-                await asyncio.sleep(0.005)
-                continue
-            if menumode:
-                user_input = user_input.split("&&")[0]
-            print(user_input)
-            buttons_to_push = []
 
-            for command in user_input.split('&&'):
-                cmd, *args = shlex.split(command)
-
-                if cmd == 'exit':
+        def _on_midi(event, data=None):
+            nonlocal jumpstate
+            message, _ = event
+            if len(message) != 3:
+                return
+            status, data_1, data_2 = message
+            kind = status & 0xF0
+            if kind == _CONTROL_CHANGE:
+                # the jump pedal sends a stream of values, only forward the transitions across 64
+                pressed = data_2 > 64
+                if pressed == jumpstate:
                     return
+                jumpstate = pressed
+            elif kind != _NOTE_ON:
+                return
+            loop.call_soon_threadsafe(self._midi_q.put_nowait, (kind, data_1, data_2))
+
+        midi_in.open_port(port_index)
+        midi_in.set_callback(_on_midi)
+        # pending releases as (deadline, note), arl_active holds the current deadline of each held note
+        arl_heap = []
+        arl_active = {}
+        menumode = True
+        menuCounter = 0
 
-                available_buttons = self.controller_state.button_state.get_available_buttons()
-
-                if hasattr(self, f'cmd_{cmd}'):
-                    try:
-                        result = await getattr(self, f'cmd_{cmd}')(*args)
-                        if result:
-                            print(result)
-                    except Exception as e:
-                        print(e)
-                elif cmd in self.commands:
-                    try:
-                        result = await self.commands[cmd](*args)
-                        if result:
-                            print(result)
-                    except Exception as e:
-                        print(e)
-                elif cmd in available_buttons:
-                    buttons_to_push.append(cmd)
+        # local names for everything used in the loop, avoids global and attribute lookups per message
+        perf_counter = time.perf_counter
+        wait_for = asyncio.wait_for
+        queue_get = self._midi_q.get
+        queue_get_nowait = self._midi_q.get_nowait
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        cmd_lut = midi_cmd_lut
+        release_lut = midi_release_lut
+        hold_lut = midi_hold_lut
+        jump_press = midi_to_cmds[6]
+        jump_release = midi_to_cmds[5]
+        dispatch_get = self._cmd_dispatch.get
+        commands_get = self.commands.get
+        cs = self.controller_state
+        push = button_push
+        # the buttons of a controller never change
+        available_buttons = frozenset(cs.button_state.get_available_buttons())
+
+        try:
+            while True:
+                # sleep until the next midi message arrives or the next held input expires
+                next_expiry = arl_heap[0][0] - perf_counter() if arl_heap else None
+                try:
+                    msg = await wait_for(queue_get(), timeout=next_expiry)
+                except asyncio.TimeoutError:
+                    msg = None
+                batch = []
+                if msg is not None:
+                    # drain everything queued meanwhile, so rolls and flams are handled in a single pass
+                    msgs = [msg]
+                    while True:
+                        try:
+                            msgs.append(queue_get_nowait())
+                        except asyncio.QueueEmpty:
+                            break
+
+                    for kind, note, value in msgs:
+                        cmds = []
+                        if kind == _NOTE_ON:
+                            note = 42 if note == 46 or (note == 38 and 38 in arl_active) else note
+                            cmds = cmd_lut[note]
+                            deadline = perf_counter() + hold_lut[note]
+                            heappush(arl_heap, (deadline, note))
+                            arl_active[note] = deadline
+                            if note==48:
+                                menuCounter += 1
+                                if menuCounter>10:
+                                    menumode = not menumode
+                                    menuCounter = 0
+                                    print("menumode "+str(menumode))
+                            else:
+                                menuCounter = 0
+                        elif kind == _CONTROL_CHANGE:
+                            # the callback only queues pedal transitions
+                            cmds = jump_press if value > 64 else jump_release
+                        batch.extend(cmds[:1] if menumode else cmds)
                 else:
-                    print('command', cmd, 'not found, call help for help.')
-
-            if buttons_to_push:
-                print("button push")
-                await button_push(self.controller_state, *buttons_to_push)
-            #else:
-            #    try:
-            #        await self.controller_state.send()
-            #    except NotConnectedError:
-            #        logger.info('Connection was lost.')
-            #        return
+                    now = perf_counter()
+                    while arl_heap and arl_heap[0][0] <= now:
+                        deadline, note = heappop(arl_heap)
+                        # skip entries superseded by a later hit of the same note
+                        if arl_active.get(note) == deadline:
+                            cmds = release_lut[note]
+                            del arl_active[note]
+                            batch.extend(cmds[:1] if menumode else cmds)
+                if not batch:
+                    continue
+                # merge neighbouring hold and release commands, so a burst sets all its buttons in one call.
+                # Only neighbours are merged to keep e.g. "hold b" before a following "release b".
+                merged = []
+                for cmd in batch:
+                    if merged and cmd[0] == merged[-1][0] and cmd[0] in ('hold', 'release'):
+                        prev = merged[-1]
+                        merged[-1] = prev + [b for b in cmd[1:] if b not in prev]
+                    else:
+                        merged.append(cmd)
+                batch = merged
+                logger.debug('cmd %s', batch)
+                buttons_to_push = []
+
+                for cmd, *args in batch:
+                    if cmd == 'exit':
+                        return
+
+                    fun = dispatch_get(cmd) or commands_get(cmd)
+                    if fun is not None:
+                        try:
+                            result = await fun(*args)
+                            if result:
+                                logger.debug('%s', result)
+                        except Exception as e:
+                            print(e)
+                    elif cmd in available_buttons:
+                        if cmd not in buttons_to_push:
+                            buttons_to_push.append(cmd)
+                    else:
+                        print('command', cmd, 'not found, call help for help.')
+
+                # one push for the whole batch
+                if buttons_to_push:
+                    logger.debug('button push %s', buttons_to_push)
+                    await push(cs, *buttons_to_push)
+                #else:
+                #    try:
+                #        await self.controller_state.send()
+                #    except NotConnectedError:
+                #        logger.info('Connection was lost.')
+                #        return
+        finally:
+            midi_in.cancel_callback()
+            midi_in.close_port()
@@ -11,7 +11,8 @@ def configure(console_level=logging.DEBUG, file_level=logging.DEBUG, logfile_nam
     :param logfile_name: name of logfile
     """
     root_logger = logging.getLogger()
-    root_logger.setLevel(logging.DEBUG)
+    # let records below every handler level short-circuit at the logger
+    root_logger.setLevel(min(console_level, file_level) if logfile_name is not None else console_level)
 
     formatter = logging.Formatter(
         "[%(asctime)s] %(name)s %(funcName)s::%(lineno)s %(levelname)s - %(message)s",